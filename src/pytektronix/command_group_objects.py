@@ -1,28 +1,87 @@
-from aenum import MultiValueEnum
+from enum import Enum
+import numpy as np
 from pytektronix.pytektronix_base_classes import CommandGroupObject, Scope
-from pytektronix.pytektronix_base_classes import ScopeStateError, LoggedVXI11
+from pytektronix.pytektronix_base_classes import ScopeStateError
 
 from string import digits
 
-class TrigStrings(MultiValueEnum):
-    READY = "ready", "rea"
-    SAVE = "save", "sav"
-    TRIGGERED = "triggered", "trig" 
-    ARMED = "armed", "arm"
-    EDGE = "edge", "edg"
-    LOGIC = "logic", "logi"
-    PULSE = "pulse", "puls"
+# Translation table used to strip channel digits (e.g. 'ch1' -> 'ch');
+# built once at import instead of per property access
+_STRIP_DIGITS = str.maketrans('', '', digits)
+
+class TrigStrings(Enum):
+    """Canonical trigger state/mode/type strings. Scope abbreviations
+       (e.g. 'rea' for 'ready') resolve through the companion alias map
+       below, so lookups are a single dict hit rather than an aenum
+       MultiValueEnum member scan."""
+    READY = "ready"
+    SAVE = "save"
+    TRIGGERED = "triggered"
+    ARMED = "armed"
+    EDGE = "edge"
+    LOGIC = "logic"
+    PULSE = "pulse"
     BUS = "bus"
-    VIDEO = "video", "vid"
-    NORMAL = "normal", "norm"
+    VIDEO = "video"
+    NORMAL = "normal"
     AUTO = "auto"
 
+    @classmethod
+    def _missing_(cls, value):
+        return _TRIG_MEMBERS.get(value)
+
+    @classmethod
+    def resolve(cls, value: str) -> str:
+        """Maps a scope reply (canonical or abbreviated, any case) to its
+           canonical string via a single dict hit; falls through to the
+           enum constructor so unknown values still raise ValueError."""
+        value = value.lower()
+        canon = _TRIG_CANONICAL.get(value)
+        return canon if canon is not None else cls(value).value
+
+# alias -> canonical-value lookup covering both the canonical strings and
+# the abbreviated forms the scope may reply with
+_TRIG_CANONICAL = {m.value: m.value for m in TrigStrings}
+_TRIG_CANONICAL.update({"rea": "ready", "sav": "save", "trig": "triggered",
+                        "arm": "armed", "edg": "edge", "logi": "logic",
+                        "puls": "pulse", "vid": "video", "norm": "normal"})
+# alias -> member companion (the enum's own _value2member_map_ only covers
+# canonical values), so TrigStrings('rea') is a single dict hit too
+_TRIG_MEMBERS = {alias: TrigStrings(canonical)
+                 for alias, canonical in _TRIG_CANONICAL.items()}
+
+# Per-model trigger source types (digit-stripped, e.g. 'ch1' -> 'ch') for
+# which a numeric LEVEL can be read/set; built once instead of per call
+_LEVEL_GET_SOURCE_TYPES = {"MDO3024": frozenset(("aux", "ch", "d")),
+                           "MSO54":   frozenset(("aux", "ch", "d")),
+                           "DEBUG":   frozenset(("ch",))}
+_LEVEL_SET_SOURCE_TYPES = {"MDO3024": frozenset(("aux", "ch", "d")),
+                           "MSO54":   frozenset(("aux", "ch", "ch_d")),
+                           "DEBUG":   frozenset(("ch",))}
+
 class Trigger(CommandGroupObject):
     def __init__(self, instr: Scope, accepted_values: dict, strict: bool=True, cn: str="trigger:a"):
         self.cn = cn
         self.instr = instr
+        # model is immutable per-connection: cache it so setters do not
+        # re-read it on every call
+        self._model = instr.model
         self.strict = strict
         self._accepted_values = accepted_values
+        # SCPI node strings built once instead of per property access
+        self._mode_node = f"{cn}:mode"
+        self._type_node = f"{cn}:type"
+        # source is only reachable with an edge trigger, so its node is
+        # fixed; level's node varies only by source, so keep the prefix
+        self._edge_source_node = f"{cn}:edge:source"
+        self._level_node_prefix = f"{cn}:level:"
+        self._setlevel_cmd = f"{cn} setlevel"
+        # trig_type memo: source/level route through trig_type, so caching
+        # it keeps a level read at one round-trip instead of several
+        self._trig_type = None
+        # level memo for the current source; a numeric set records it so
+        # the readback after a write costs no round-trip
+        self._level = None
 
     @property
     def accepted_values(self):
@@ -46,83 +105,131 @@ class Trigger(CommandGroupObject):
     
     def autoset(self)-> None:
         """Automatically set trigger level to 50% of range"""
-        self.instr.write(f"{self.cn} setlevel") 
+        self.instr.write(self._setlevel_cmd)
+        # the scope picked the level; force the next read to fetch it
+        self._level = None
 
     @property
     def state(self):
         """Get current trigger STATE"""
         raw = self.instr.ask("trigger:state")
-        return TrigStrings(raw.lower()).value
+        return TrigStrings.resolve(raw)
 
     @property
     def mode(self):
         """Get current trigger MODE"""
-        raw = self.instr.ask(f"{self.cn}:mode")
-        return TrigStrings(raw.lower()).value
+        raw = self.instr.ask(self._mode_node)
+        return TrigStrings.resolve(raw)
     @mode.setter
     def mode(self, value: str):
         """Set trigger MODE"""
-        self._global_setter("mode",f"{self.cn}:mode", value)
+        self._global_setter("mode", self._mode_node, value)
+
+    def set_and_get_mode(self, value: str) -> str:
+        """Sets trigger MODE and confirms the readback in one compound
+           transaction: a single round-trip instead of a write plus a
+           query"""
+        raw = self._global_set_and_get("mode", self._mode_node, value)
+        return TrigStrings.resolve(raw)
 
     @property
     def trig_type(self):
-        """Get current trigger TYPE"""
-        return TrigStrings(self.instr.ask(f"{self.cn}:type").lower()).value
+        """Get current trigger TYPE; memoized so the source and level
+           properties (which consult it) do not re-query the scope"""
+        if self._trig_type is None:
+            raw = self.instr.ask(self._type_node)
+            self._trig_type = TrigStrings.resolve(raw)
+        return self._trig_type
     # TODO: types
     @trig_type.setter
     def trig_type(self, value: str):
         """Set trigger TYPE"""
-        self._global_setter("trig_type", f"{self.cn}:type", value)
-    
+        self._global_setter("trig_type", self._type_node, value)
+        self._trig_type = value.lower() if isinstance(value, str) else value
+
+    def set_and_get_type(self, value: str) -> str:
+        """Sets trigger TYPE and confirms the readback in one compound
+           transaction, refreshing the trig_type memo from the answer"""
+        raw = self._global_set_and_get("trig_type", self._type_node, value)
+        self._trig_type = TrigStrings.resolve(raw)
+        return self._trig_type
+
+    def invalidate_cache(self) -> None:
+        """Clears the memoized trigger type and level (call after a default
+           setup or anything else that changes the trigger behind this
+           object's back)"""
+        self._trig_type = None
+        self._level = None
+
     @property
     def source(self):
         """Get current trigger SOURCE"""
         trig_type = self.trig_type
-        if self.trig_type not in "edge":
+        if trig_type != "edge":
             raise NotImplementedError("Source can only be set when trig type is edge")
-        return self.instr.ask(f"{self.cn}:{trig_type}:source").lower()
+        return self.instr.ask(self._edge_source_node).lower()
 
     @source.setter
     def source(self, value):
         """Set trigger SOURCE"""
         trig_type = self.trig_type
-        if trig_type not in ["edge"]:
+        if trig_type != "edge":
             raise NotImplementedError("Source can only be set when trig type is edge")
-        
-        self._global_setter("source", f"{self.cn}:{trig_type}:source", value)
+
+        self._global_setter("source", self._edge_source_node, value)
+        # level is per-source: the memo no longer describes this source
+        self._level = None
+
+    def set_and_get_source(self, value: str) -> str:
+        """Sets trigger SOURCE and confirms the readback in one compound
+           transaction; like the property, only valid for an edge trigger"""
+        if self.trig_type != "edge":
+            raise NotImplementedError("Source can only be set when trig type is edge")
+        raw = self._global_set_and_get("source", self._edge_source_node, value)
+        # level is per-source: the memo no longer describes this source
+        self._level = None
+        return raw.lower()
 
     @property
     def level(self) -> float:
-        """Get current trigger LEVEL"""
-        trig_source = self.source 
-        trig_source_type = trig_source.translate(str.maketrans('','',digits))
-        accepted_values = {"MDO3024": ["aux", "ch", "d"],
-                           "MSO54": ["aux", "ch", "d"], 
-                           "DEBUG":   ["ch"]}
-        if trig_source_type not in accepted_values[self.instr.model]:
+        """Get current trigger LEVEL (memoized after a read or a numeric
+           set; see invalidate_cache)"""
+        if self._level is not None:
+            return self._level
+        trig_source = self.source
+        trig_source_type = trig_source.translate(_STRIP_DIGITS)
+        if trig_source_type not in _LEVEL_GET_SOURCE_TYPES[self._model]:
             return "Trigger level cannot be ascertained for sources other that CH<i>, D<i>, or AUX"
-        raw = self.instr.ask(f"{self.cn}:level:{trig_source}")
-        return float(raw)
+        self._level = float(self.instr.ask(self._level_node_prefix + trig_source))
+        return self._level
     @level.setter
     def level(self, value):
         """Set trigger LEVEL"""
-        trig_source = self.source 
-        trig_source_type = trig_source.translate(str.maketrans('','',digits))
-        accepted_source_values = {"MDO3024": ["aux", "ch", "d"],
-                                  "MSO54": ["aux", "ch", "ch_d"], 
-                                  "DEBUG":   ["ch"]}
-        if trig_source_type not in accepted_source_values[self.instr.model]:
+        trig_source = self.source
+        trig_source_type = trig_source.translate(_STRIP_DIGITS)
+        if trig_source_type not in _LEVEL_SET_SOURCE_TYPES[self._model]:
             return "Trigger level cannot be ascertained for sources other that CH<i>, D<i>, or AUX"
-        self._global_setter("level", f"{self.cn}:level:{trig_source}", value)
+        self._global_setter("level", self._level_node_prefix + trig_source, value)
+        # ttl/ecl resolve to a scope-chosen voltage, so only a numeric
+        # set can be recorded without a readback
+        is_numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+        self._level = float(value) if is_numeric else None
 
 
 class Horizontal(CommandGroupObject):
     def __init__(self, instr: Scope, accepted_values: dict, strict: bool=True, cn: str="horizontal"):
         self.cn = cn
         self.instr = instr
+        # model is immutable per-connection: cache it so setters do not
+        # re-read it on every call
+        self._model = instr.model
         self.strict = strict
         self._accepted_values = accepted_values
-   
+        # SCPI node strings built once instead of per property access
+        self._scale_node = f"{cn}:scale"
+        self._position_node = f"{cn}:position"
+        self._samplerate_node = f"{cn}:samplerate"
+
     @property
     def accepted_values(self):
         """The accepted_values property."""
@@ -134,36 +241,46 @@ class Horizontal(CommandGroupObject):
     @property
     def scale(self):
         """Get the current horizontal SCALE [S]"""
-        return float(self.instr.ask(f"{self.cn}:scale"))
+        return float(self.instr.ask(self._scale_node))
     @scale.setter
     def scale(self, value) -> float:
         """Specifies horizontal SCALE (400ps to 1000s).
            NOTE: Must be an exact scope scale increment (1, 4, 10 etc)"""
-        self._global_setter("scale", f"{self.cn}:scale", value)
+        self._global_setter("scale", self._scale_node, value)
 
     @property
     def position(self) -> float:
         """Gets current horizontal POSITION"""
-        return float(self.instr.ask(f"{self.cn}:position"))
+        return float(self.instr.ask(self._position_node))
     @position.setter
     def position(self, value):
         """Sets current horizontal POSITION as a percentage of the 
            currently captured waveform: [0%, 100%]"""
-        self._global_setter("position", f"{self.cn}:position", value)
+        self._global_setter("position", self._position_node, value)
     
     @property
     def sample_rate(self):
         """Get the current horizontal SAMPLERATE"""
-        return self.instr.ask(f"{self.cn}:samplerate")
+        return self.instr.ask(self._samplerate_node)
 
 class Channel(CommandGroupObject):
     def __init__(self, chan_num: int, instr: Scope, accepted_values: dict, 
                  is_digital: bool=False, strict: bool=True, cn: str="ch"):
         self.cn = f"{cn}{chan_num}"
         self.instr = instr
+        self._model = instr.model
         self.is_digital = is_digital
         self.strict = strict
         self._accepted_values = accepted_values
+        # SCPI node strings built once instead of per property access
+        self._position_node = f"{self.cn}:position"
+        self._offset_node = f"{self.cn}:offset"
+        self._scale_node = f"{self.cn}:scale"
+        self._probe_resistance_node = f"{self.cn}:probe:resistance"
+        self._coupling_node = f"{self.cn}:coupling"
+        self._meas_source_cmd = f"measurement:immed:source1 {self.cn}"
+        self._probe_resistance = None
+        self._scale = None
 
     @property
     def accepted_values(self):
@@ -178,74 +295,142 @@ class Channel(CommandGroupObject):
         """The position property."""
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no position property")
-        return float(self.instr.ask(f"{self.cn}:position"))
+        return float(self.instr.ask(self._position_node))
     @position.setter
     def position(self, value):
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no position property")
-        self._global_setter("position", f"{self.cn}:position", value)
+        self._global_setter("position", self._position_node, value)
 
     @property
     def offset(self) -> float:
         """The offset property."""
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no offset property")
-        return float(self.instr.ask(f"{self.cn}:offset"))
+        return float(self.instr.ask(self._offset_node))
     @offset.setter
     def offset(self, value):
         """Set the channel offset"""
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no offset property")
-        self._global_setter("offset", f"{self.cn}:offset", value)
+        self._global_setter("offset", self._offset_node, value)
 
     @property
     def scale(self) -> float:
-        """The scale property."""
+        """The scale property. The value set last is remembered so
+           offset-range computations during a sweep do not re-query the
+           scope (see invalidate_cache)."""
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no scale property")
-        return float(self.instr.ask(f"{self.cn}:scale"))
+        if self._scale is None:
+            self._scale = float(self.instr.ask(self._scale_node))
+        return self._scale
     @scale.setter
     def scale(self, value) -> None:
         """Sets the channel SCALE to <value> V/Division"""
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no scale property")
         # TODO: FIX MDO3024 accepted scale range
-        self._global_setter("scale", f"{self.cn}:scale", value)
+        self._global_setter("scale", self._scale_node, value)
+        self._scale = float(value)
 
     @property
     def probe_resistance(self) -> float:
-        """Get channel PROBE RESISTANCE in OHMS"""
+        """Get channel PROBE RESISTANCE in OHMS. Cached after the first
+           read since it only changes when the probe is swapped (see
+           invalidate_cache)."""
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no probe resistance property")
-        return float(self.instr.ask(f"{self.cn}:probe:resistance"))
+        if self._probe_resistance is None:
+            self._probe_resistance = float(self.instr.ask(self._probe_resistance_node))
+        return self._probe_resistance
+
+    def invalidate_cache(self) -> None:
+        """Clears cached probe identity and scale values (call after
+           swapping probes or resetting the scope)"""
+        self._probe_resistance = None
+        self._scale = None
+
+    def get_measurement(self, meas_type: str) -> float:
+        """Takes an immediate measurement (frequency, amplitude, etc.) on
+           this channel. The source and type commands go out as one batched
+           write, so a measurement costs two bus transactions rather than
+           three."""
+        self.instr.write_batch([self._meas_source_cmd,
+                                f"measurement:immed:type {meas_type}"])
+        return float(self.instr.ask("measurement:immed:value"))
 
     @property
     def coupling(self):
         """The coupling property."""
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no coupling property")
-        return self.instr.ask(f"{self.cn}:coupling")
+        return self.instr.ask(self._coupling_node)
     @coupling.setter
     def coupling(self, value):
         if self.is_digital:
             raise ScopeNotSupportedError("Digital Channels have no position property")
-        self._global_setter("coupling", f"{self.cn}:coupling", value)
+        self._global_setter("coupling", self._coupling_node, value)
 
-class WFStrings(MultiValueEnum):
-    ASCII = 'ascii', 'asc'
+class WFStrings(Enum):
+    """Canonical waveform encoding strings; abbreviations resolve through
+       the companion alias map below (see TrigStrings)."""
+    ASCII = 'ascii'
     FASTEST = 'fastest'
-    RIBINARY = 'ribinary', 'rib'
-    RPBINARY = 'rpbinary', 'rpb'
-    SRIBINARY = 'sribinary', 'sri'
-    SRPBINARY = 'srpbinary', 'srp'
-    FPBINARY = 'fpbinary', 'fpb'
-    SFPBINARY = 'sfpbinary', 'sfp'
+    RIBINARY = 'ribinary'
+    RPBINARY = 'rpbinary'
+    SRIBINARY = 'sribinary'
+    SRPBINARY = 'srpbinary'
+    FPBINARY = 'fpbinary'
+    SFPBINARY = 'sfpbinary'
+
+    @classmethod
+    def _missing_(cls, value):
+        return _WF_MEMBERS.get(value)
+
+    @classmethod
+    def resolve(cls, value: str) -> str:
+        """Maps a scope reply to its canonical encoding string via a single
+           dict hit (see TrigStrings.resolve)."""
+        value = value.lower()
+        canon = _WF_CANONICAL.get(value)
+        return canon if canon is not None else cls(value).value
+
+_WF_CANONICAL = {m.value: m.value for m in WFStrings}
+_WF_CANONICAL.update({"asc": "ascii", "rib": "ribinary", "rpb": "rpbinary",
+                      "sri": "sribinary", "srp": "srpbinary",
+                      "fpb": "fpbinary", "sfp": "sfpbinary"})
+_WF_MEMBERS = {alias: WFStrings(canonical)
+               for alias, canonical in _WF_CANONICAL.items()}
+
+# Encodings whose CURVE? replies carry the #N<len> binary block header;
+# everything except ascii, including 'fastest' (which selects a binary
+# format on the scope)
+_BINARY_ENCODINGS = frozenset(m.value for m in WFStrings if m is not WFStrings.ASCII)
+
+# numpy dtype of a CURVE? payload, keyed by (data_encoding, data_width).
+# Tektronix "s"-prefixed encodings are byte-swapped (little-endian), the
+# rest are big-endian, and "fastest" resolves to ribinary on the models
+# supported here. Byte order lives in the dtype so np.frombuffer yields
+# a correct zero-copy view with no per-sample swapping pass; fp
+# encodings are IEEE floats and only exist at widths 4 and 8.
+_WAVEFORM_DTYPES = {}
+for _enc, _kind, _order in (("ribinary", "i", ">"), ("sribinary", "i", "<"),
+                            ("rpbinary", "u", ">"), ("srpbinary", "u", "<"),
+                            ("fpbinary", "f", ">"), ("sfpbinary", "f", "<"),
+                            ("fastest", "i", ">")):
+    for _w in (1, 2, 4, 8):
+        if _kind == "f" and _w < 4:
+            continue
+        _WAVEFORM_DTYPES[(_enc, _w)] = np.dtype(f"{_order}{_kind}{_w}")
 
 class WaveformTransfer(CommandGroupObject):
     def __init__(self, instr: Scope, accepted_values: dict, 
                  strict: bool=False, auto_init=True):
-        self.cn = "" 
+        self.cn = ""
         self.instr = instr
+        self._model = instr.model
+        self._data_source = None
         self.strict = strict
         self.data_ready = False
         self._accepted_values = accepted_values
@@ -260,10 +445,18 @@ class WaveformTransfer(CommandGroupObject):
     def accepted_values(self, value):
         self._accepted_values = value
 
+    def invalidate_cache(self) -> None:
+        """Clears the memoized data source (call after a default setup or
+           anything else that reconfigures the waveform path externally)"""
+        self._data_source = None
+
     def initialize_data(self, data_source: str = "CH1"):
-        self.data_source = "CH1"
-        self.data_encoding = "fastest"
-        self.data_width = 1
+        """Sets the waveform transfer defaults, batched so they go out as
+           compound writes instead of one bus transaction per property."""
+        with self.instr.auto_flush():
+            self.data_source = "CH1"
+            self.data_encoding = "fastest"
+            self.data_width = 1
         self.data_ready = True
 
     def get_data_preamble(self):
@@ -275,17 +468,22 @@ class WaveformTransfer(CommandGroupObject):
 
     @property
     def data_source(self):
-        """The data_source property."""
-        return self.instr.ask("data:source")
+        """The data_source property; memoized so read-after-write (e.g. the
+           data_width setter) does not cost a round-trip."""
+        if self._data_source is None:
+            self._data_source = self.instr.ask("data:source")
+        return self._data_source
     @data_source.setter
     def data_source(self, value):
         #TODO: Fix allowed types!
         self._global_setter("data_source", "data:source", value)
+        self._data_source = value.lower() if isinstance(value, str) else value
 
     @property
     def data_encoding(self):
         """The data_encoding property."""
-        return WFStrings(self.instr.ask("data:encdg").lower()).value
+        raw = self.instr.ask("data:encdg")
+        return WFStrings.resolve(raw)
     @data_encoding.setter
     def data_encoding(self, value):
         self._global_setter("data_encoding", "data:encdg", value)
@@ -342,18 +540,44 @@ class WaveformTransfer(CommandGroupObject):
 
         self.instr.write("curve?")
 
-        if type(self.instr) == LoggedVXI11: 
-            data =  self.instr.read()
-        else:
-            data = self.instr.read_raw() 
-             
-        if ('binary' or 'fastest') in de:
+        if de in _BINARY_ENCODINGS and hasattr(self.instr, "read_binary_block"):
+            # sized read: the block header gives the payload length up front
+            return self.instr.read_binary_block()
+
+        # both transports expose a raw-bytes reader now; the old VXI-11
+        # branch decoded binary payloads through a str round-trip
+        data = self.instr.read_raw()
+
+        if de in _BINARY_ENCODINGS:
             # Removes #N<ndigits> header from binary encoding
             # data[1] contains the N of <n-digits>
-            # the char and int cast turn it fome an ascii byte into an integer
-            # the 2 is there because the 0th index of the bytearray contains '
-            # and the 1th index of the bytearray is the N iteslf.
-            data = data[2 + int(chr(data[1])):] 
+            # the 2 is there because the 0th index of the bytearray contains '#'
+            # and the 1th index of the bytearray is the N itself.
+            # indexing a bytearray yields the raw byte value, so the digit
+            # count is an ASCII subtraction (no chr/int round-trip); the
+            # in-place truncations avoid a second copy of a potentially
+            # MB-scale payload
+            ndigits = data[1] - 48
+            payload_len = int(data[2:2 + ndigits])
+            del data[:2 + ndigits]
+            # the raw reader keeps the message terminator that follows the
+            # block; trim by the declared payload length rather than by
+            # byte value, so a final sample that happens to be 0x0A or
+            # 0x0D is not mistaken for it
+            del data[payload_len:]
 
         return data
 
+    def get_data_array(self) -> np.ndarray:
+        """Reads the waveform and returns it as a numpy array of the dtype
+           implied by data_encoding and data_width. np.frombuffer wraps the
+           header-stripped payload without copying, so the whole transfer
+           is one network read, an in-place header skip and a zero-copy
+           view."""
+        data = self.get_data()
+        dtype = _WAVEFORM_DTYPES.get((self.data_encoding, self.data_width))
+        if dtype is None:
+            raise ValueError(f"No array dtype for encoding "
+                             f"'{self.data_encoding}' at width {self.data_width}")
+        return np.frombuffer(data, dtype=dtype)
+
@@ -1,8 +1,11 @@
+import os
+import socket
 import pyvisa
 import vxi11
 from typing import Tuple
 from pathlib import Path
 from abc import ABCMeta, abstractmethod, abstractproperty
+from contextlib import contextmanager
 
 class ScopeStateError(Exception):
     """An Error type for when the scopes current state is not correct for a 
@@ -22,8 +25,18 @@ class ScopeNotSupportedError(Exception):
         super().__init__(message)
 
 class Scope(metaclass=ABCMeta):
-    """An abstract metaclass for any type of scope communication 
-      (VISA, VXI11,  DEBUG, etc.)""" 
+    """An abstract metaclass for any type of scope communication
+      (VISA, VXI11,  DEBUG, etc.)"""
+
+    # Whether the scope can parse SCPI compound commands ("q1?;:q2?").
+    # Scope classes which cannot (e.g. DebugScope) should set this False.
+    supports_compound = True
+
+    # Last HEADER mode written to the instrument (None = unknown); lets
+    # ensure_header skip redundant round-trips when wrappers are rebuilt
+    # on the same transport.
+    _header_mode = None
+
     @abstractmethod
     def ask(self) -> str:
         """An ask method to query the scope which expects to return a string \
@@ -32,16 +45,100 @@ class Scope(metaclass=ABCMeta):
 
     @abstractmethod
     def write(self) -> None:
-        """A method to send a command to the scope without waiting for a 
+        """A method to send a command to the scope without waiting for a
            response"""
         pass
 
+    def enqueue(self, node: str, value) -> None:
+        """Queues a '<node> <value>' command for transmission, replacing any
+           pending write to the same SCPI node (older writes to a node are
+           superseded by newer ones). Outside of a batch (see auto_flush)
+           this writes immediately."""
+        if not getattr(self, "_batching", False):
+            self.write(f"{node} {value}")
+            return
+        self._pending[node] = value
+
+    def flush(self) -> None:
+        """Sends all queued commands in one compound write (';:' joined),
+           or one write per command if the scope cannot handle compound
+           commands."""
+        pending = getattr(self, "_pending", None)
+        if not pending:
+            return
+        commands = [f"{node} {value}" for node, value in pending.items()]
+        pending.clear()
+        self.write_batch(commands)
+
+    def _note_reset(self, command: str) -> None:
+        """Drops the cached HEADER mode when an outgoing command carries
+           *RST: the reset returns the header setting to its power-on
+           default behind ensure_header's cache. The '*' membership test
+           keeps the cost of the check off the plain-SCPI hot path."""
+        if "*" in command and self._header_mode is not None \
+                and "*rst" in command.lower():
+            self._header_mode = None
+
+    def ensure_header(self, mode: int=0) -> None:
+        """Writes 'HEADER <mode>' only when the instrument is not already
+           known to be in that mode. Anything that resets the scope behind
+           this cache (e.g. a default setup) must refresh _header_mode."""
+        if self._header_mode == mode:
+            return
+        self.write(f"HEADER {mode}")
+        self._header_mode = mode
+
+    def write_batch(self, commands: list) -> None:
+        """Sends a list of ready-made commands as one compound write (';:'
+           joined), one bus transaction instead of one per command. For
+           incremental batching use auto_flush/enqueue instead."""
+        if not commands:
+            return
+        if self.supports_compound:
+            self.write(";:".join(commands))
+        else:
+            for command in commands:
+                self.write(command)
+
+    @contextmanager
+    def auto_flush(self):
+        """A context manager which batches all enqueued writes issued inside
+           it and flushes them as a single compound write on exit."""
+        if not hasattr(self, "_pending"):
+            self._pending = {}
+        self._batching = True
+        try:
+            yield self
+        finally:
+            self._batching = False
+            self.flush()
+
+    def ask_many(self, queries: list) -> list:
+        """Batches several queries into one SCPI compound query (';:' joined)
+           so a group of reads costs a single bus round-trip instead of one
+           round-trip per query. Falls back to per-query asks if the scope
+           does not support compound commands."""
+        if not self.supports_compound:
+            return [self.ask(q) for q in queries]
+        compound = ";:".join(q + "?" if "?" not in q else q for q in queries)
+        return [r.strip() for r in self.ask(compound).split(";")]
+
+    def set_and_ask(self, node: str, value) -> str:
+        """Writes '<node> <value>' and queries the node back in one compound
+           transaction, so a confirmed set costs a single round-trip instead
+           of a write followed by a query. Falls back to the two-step form
+           when the scope cannot parse compound commands."""
+        if not self.supports_compound:
+            self.write(f"{node} {value}")
+            return self.ask(node)
+        return self.ask(f"{node} {value};:{node}?")
+
 class CommandGroupObject(metaclass=ABCMeta):
     """A command group meta object which all command group classes can inherit."""
 
-    @property
-    def supported_models(self):
-        return ["MSO54", "MDO3024", "DEBUG"]
+    # class-level constant: the old property built a fresh list on every
+    # read, once per SCPI write via _set_property_accepted_vals
+    supported_models = frozenset(("MSO54", "MDO3024", "DEBUG"))
 
     @abstractproperty
     def accepted_values(self):
@@ -49,50 +146,108 @@ class CommandGroupObject(metaclass=ABCMeta):
 
     def _global_setter(self, command_name: str, command: str, value):
         """Global call for setting"""
-        if command_name not in self.accepted_values.keys():
-            raise KeyError(f"No accepted value present for '{command_name.upper()}' - please set an accepted value parameter for '{command_name}'") 
-        av = self.accepted_values[command_name]
+        av = self.accepted_values.get(command_name)
+        if av is None:
+            raise KeyError(f"No accepted value present for '{command_name.upper()}' - please set an accepted value parameter for '{command_name}'")
         self._set_property_accepted_vals(command, av, value)
             
+    def _build_validator(self, prop: str, accepted_values: list):
+        """Builds a value-checking closure for one property, hoisting the
+           accepted-value scans (range extraction, string set construction)
+           out of the per-set hot path."""
+        any_number = "any_number" in accepted_values
+        ranges = [x for x in accepted_values if isinstance(x, tuple)]
+        accepted_range = ranges[0] if ranges else None
+        lo, hi = (min(accepted_range), max(accepted_range)) if accepted_range else (None, None)
+        strings = frozenset(x for x in accepted_values if isinstance(x, str))
+        strings_err = ','.join(str(x) for x in accepted_values)
+
+        def validate(value):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if not any_number and accepted_range and (value < lo or value > hi):
+                    raise ValueError(f"'{value}' is not in range {accepted_range}.")
+            elif isinstance(value, str):
+                # canonicalize to lowercase on the way out so loopback reads
+                # (logs, debug scopes) come back in canonical form already
+                value = value.lower()
+                if value not in strings:
+                    raise ValueError(f"{value} is not an accepted trigger {prop}.\n",
+                                     f"Must be one of: ({strings_err})")
+            return value
+
+        return validate
+
+    def _global_set_and_get(self, command_name: str, command: str, value) -> str:
+        """Validated set with an atomic readback: like _global_setter, but
+           the write and the confirming query go out as one compound
+           transaction (see Scope.set_and_ask)."""
+        av = self.accepted_values.get(command_name)
+        if av is None:
+            raise KeyError(f"No accepted value present for '{command_name.upper()}' - please set an accepted value parameter for '{command_name}'")
+        if self._model not in self.supported_models:
+            raise NotImplementedError(f"MODEL== {self._model} - Only models {','.join(sorted(self.supported_models))} currently supported")
+        return self.instr.set_and_ask(command, self._validator_for(command, av)(value))
+
+    def _validator_for(self, prop: str, models_accepted_values):
+        """Returns the cached value-checking closure for one property,
+           rebuilding it only when the accepted-value list is swapped for
+           a new one (e.g. data_width)."""
+        cache = getattr(self, "_validators", None)
+        if cache is None:
+            cache = self._validators = {}
+        entry = cache.get(prop)
+        if entry is None or entry[0] is not models_accepted_values:
+            entry = (models_accepted_values,
+                     self._build_validator(prop, models_accepted_values))
+            cache[prop] = entry
+        return entry[1]
+
     def _set_property_accepted_vals(self, prop: str, models_accepted_values: dict, value: any):
-        if self.instr.model not in self.supported_models:
-            raise NotImplementedError(f"MODEL== {self.instr.model} - Only models {','.join(self.supported_models)} currently supported")
+        if self._model not in self.supported_models:
+            # error path only: the join is not paid on successful writes
+            raise NotImplementedError(f"MODEL== {self._model} - Only models {','.join(sorted(self.supported_models))} currently supported")
 
-        accepted_values = models_accepted_values #models_accepted_values[self.instr.model]
-        
-        if type(value) in [float, int]: 
-            if "any_number" in accepted_values:
-                pass
-            elif any(isinstance(x, tuple) for x in accepted_values):
-                accepted_range = [x for x in accepted_values if isinstance(x, tuple)][0]
-                if not accepted_range and not isinstance(accepted_range, tuple):
-                    raise ValueError("Range {accepted_range} is not accepted type")
-                if value < min(accepted_range) or value > max(accepted_range):
-                    raise ValueError(f"'{value}' is not in range {accepted_range}.")
+        self.instr.enqueue(prop, self._validator_for(prop, models_accepted_values)(value))
 
-        elif type(value) in [str]:
-            if value.lower() not in accepted_values:
-                raise ValueError(f"{value} is not an accepted trigger {prop}.\n", 
-                                 f"Must be one of: ({','.join(accepted_values)})") 
+_RESOURCE_MANAGER = None
 
-        self.instr.write(f"{prop} {value}")
+def _get_resource_manager() -> "pyvisa.ResourceManager":
+    """Returns the process-wide pyvisa ResourceManager, creating it on first
+       use; constructing one per call opens a fresh VISA session each time."""
+    global _RESOURCE_MANAGER
+    if _RESOURCE_MANAGER is None:
+        _RESOURCE_MANAGER = pyvisa.ResourceManager()
+    return _RESOURCE_MANAGER
 
 class LoggedVISA(Scope):
-    def __init__(self, resource_id: str=None, loud: bool=False, log: bool=True):
+    def __init__(self, resource_id: str=None, loud: bool=False, log: bool=True,
+                 chunk_size: int=1024*1024, log_file: str=None,
+                 log_flush_threshold: int=10000, timeout: int=None):
         if not resource_id:
             self.visa = self._get_resource()
         else:
             try:
-                self.visa = pyvisa.ResourceManager().open_resource(resource_id)
+                self.visa = _get_resource_manager().open_resource(resource_id)
             except OSError:
                 print("Resource Identifier '{resource_id}' is invalid...")
                 self.visa = self._get_resource()
 
+        # pyvisa's default chunk size (20KB) forces many reassembly reads
+        # on large CURVE? transfers; a 1MB chunk moves most waveforms in
+        # one or two reads
+        self.visa.chunk_size = chunk_size
+        # a short timeout (ms) here makes the identification query below
+        # fail fast when no scope is listening, instead of hanging for
+        # the backend default; None keeps the backend default
+        if timeout is not None:
+            self.visa.timeout = timeout
         self.loud = loud
         self.log_loud = log
-        self.log_str: str = ""
-        # TODO: Correct This:
-        self.make, self.model = self.ask("*IDN?").split(",")[0:2]
+        self.log_file = log_file
+        self.log_flush_threshold = log_flush_threshold
+        self._log_parts: list = []
+        self._logged_cmds: set = set()
+        self.make, self.model = self._get_make_and_model()
 
     def _get_make_and_model(self):
         self.make, self.model = self.ask("*IDN?").split(",")[0:2]
@@ -100,35 +255,40 @@ class LoggedVISA(Scope):
 
     def _get_resource(self) -> pyvisa.Resource:
         """Gets a scope from the visa manager via command line options"""
-        # Instantiate the Resource Manager and get the resources
-        rm = pyvisa.ResourceManager()
+        # Use the shared Resource Manager and get the resources
+        rm = _get_resource_manager()
         resources = rm.list_resources()
 
+        if not resources:
+            raise ScopeStateError("No VISA resources found - please connect "
+                                  "a scope (USB, TCPIP, ETHERNET)")
+
         # If there is only one resource, just get that
-        if len(resources) <= 1:
+        if len(resources) == 1:
             return rm.open_resource(resources[0])
     
         # Let user choose one of the resources
         print("Select a resource from the following list:")
         for idx, resource in enumerate(resources):
             print(f"{idx+1}: {resource}")
-        
-        res = int(input("\nType the number of the resource desired: "))
-        
-        # Fancy error checking - recursive (potential danger)
-        try:
-            return rm.open_resource(resources[int(res-1)])
-        except ValueError:
-            print(f"'{res}' is not a selectable resource.")
-            print("Restarting...")
-            return self._get_resource()
+
+        # loop on bad input instead of recursing (which re-listed the
+        # resources and grew the stack on every retry)
+        while True:
+            res = input("\nType the number of the resource desired: ")
+            try:
+                return rm.open_resource(resources[int(res)-1])
+            except (ValueError, IndexError):
+                print(f"'{res}' is not a selectable resource.")
     
     def _check_instrument_errors(self, command: str = None, strict = False) -> Tuple[bool, str]:
         return False, "No Error" 
 
     def ask(self, q: str) -> str:
         """Sends a query string to the oscilloscope"""
+        self.flush()
         q = q + "?" if "?" not in q else q
+        self._note_reset(q)
         result = self.visa.query(q)
         err, err_str = self._check_instrument_errors(q)
         self.log(q, err, err_str)
@@ -138,65 +298,203 @@ class LoggedVISA(Scope):
 
         return result.strip()
     
-    def write(self, command: str) -> None: 
+    def write(self, command: str) -> None:
         """Writes a command string to the oscilloscope"""
         if self.loud:
             print(f"Writing Command '{command}'...")
+        self._note_reset(command)
         self.visa.write(command)
         err, err_str = self._check_instrument_errors(command)
         
         self.log(command, err, err_str)
 
+    def poll(self, q: str) -> float:
+        """A lightweight numeric query for tight state-polling loops (BUSY,
+           trigger:state etc.): uses query_ascii_values and skips the log
+           and error bookkeeping that ask performs on every call."""
+        q = q + "?" if "?" not in q else q
+        return self.visa.query_ascii_values(q)[0]
+
     def read_raw(self):
         if self.loud:
             print("Reading Scope...")
 
-        return self.visa._read_raw().strip()
+        data = self.visa._read_raw()
+        # trim terminator/padding in place: strip() would re-copy the
+        # whole (potentially MB-scale) payload just to drop a newline
+        start, end = 0, len(data)
+        while end > start and data[end - 1] in b" \t\r\n":
+            end -= 1
+        while start < end and data[start] in b" \t\r\n":
+            start += 1
+        del data[end:]
+        del data[:start]
+        return data
+
+    def read_binary_block(self) -> bytes:
+        """Reads a definite-length SCPI binary block (#N<len><payload>).
+           The payload size is parsed from the block header so the payload
+           is read with one sized read_bytes call instead of read_raw's
+           chunked reassembly and re-copy."""
+        if self.loud:
+            print("Reading Scope...")
+
+        header = self.visa.read_bytes(2)
+        ndigits = int(header[1:2])
+        nbytes = int(self.visa.read_bytes(ndigits))
+        data = self.visa.read_bytes(nbytes)
+        try:
+            # consume the trailing block terminator
+            self.visa.read_bytes(1)
+        except pyvisa.VisaIOError:
+            pass
+        return data
 
     def close(self):
         """Closes the visa connection"""
         self.visa.close()
 
+    @property
+    def log_str(self) -> str:
+        """The accumulated command log, joined on demand from the list of
+           entries so logging appends are O(1) instead of quadratic string
+           concatenation."""
+        return "".join(self._log_parts)
+
     def log(self, value: str, err: bool=False, err_str: str=None) -> None:
-        """Logs the commands sent to the scope, and notes if there was an error"""
-        value += "\n" if "\n" not in value else value 
+        """Logs the commands sent to the scope, and notes if there was an error.
+           A no-op when logging was disabled at construction (log=False), so
+           disabled logging pays no formatting or append cost."""
+        if not self.log_loud:
+            return
+        self._logged_cmds.add(value.strip())
+        value += "\n" if "\n" not in value else value
         if err:
             value = value+f" [FAILED - '{err_str}']"
-        self.log_str += value
+        self._log_parts.append(value)
+        if self.log_file and len(self._log_parts) >= self.log_flush_threshold:
+            self.flush_log()
+
+    def logged(self, cmd: str) -> bool:
+        """Whether cmd was sent to the scope this session: an O(1) set hit
+           for exact commands, with a substring scan fallback for partial
+           patterns. The set survives flush_log, so the check stays valid
+           after the text log has been drained to disk."""
+        if cmd in self._logged_cmds:
+            return True
+        return any(cmd in entry for entry in self._log_parts)
+
+    def flush_log(self) -> None:
+        """Appends the buffered log entries to log_file and clears the
+           in-memory buffer. Without a log_file the entries stay in memory,
+           so long sessions should pass one to bound growth."""
+        if not (self._log_parts and self.log_file):
+            return
+        with open(self.log_file, "a") as log_f:
+            log_f.writelines(self._log_parts)
+        self._log_parts.clear()
 
 
 class LoggedVXI11(vxi11.Instrument, Scope):
     # TODO: Implement Loud VXI11
-    def __init__(self, IP: str, loud: bool=False):
+    def __init__(self, IP: str, loud: bool=False, log_file: str=None,
+                 log_flush_threshold: int=10000):
         super().__init__(IP)
-        self.log: str = ""
+        self.log_file = log_file
+        self.log_flush_threshold = log_flush_threshold
+        self._log_parts: list = []
         self.ip = IP if IP else os.environ["OSCILLOSCOPE"]
+        # open the link now so the bulk-read size (max_recv_size) is
+        # negotiated once up front instead of lazily inside the first read
+        self.open()
+        # disable Nagle so small SCPI commands are not held back waiting
+        # for a delayed ACK - waveform reads interleave tiny writes with
+        # MB-scale reads and stall badly otherwise
+        self.client.sock.setsockopt(socket.IPPROTO_TCP,
+                                    socket.TCP_NODELAY, 1)
         self.make, self.model = self._get_make_and_model()
 
     def _get_make_and_model(self):
         self.make, self.model = self.ask("*IDN?").split(",")[0:2]
         return self.make, self.model
 
+    @property
+    def log(self) -> str:
+        """The accumulated command log (see LoggedVISA.log_str)"""
+        return "".join(self._log_parts)
+
     def write(self, query: str):
-        self.log += f"{query}\n"
+        self._log_parts.append(f"{query}\n")
+        if self.log_file and len(self._log_parts) >= self.log_flush_threshold:
+            self.flush_log()
+        self._note_reset(query)
         super().write(query)
 
+    def flush_log(self) -> None:
+        """Appends the buffered log entries to log_file and clears the
+           in-memory buffer (see LoggedVISA.flush_log)."""
+        if not (self._log_parts and self.log_file):
+            return
+        with open(self.log_file, "a") as log_f:
+            log_f.writelines(self._log_parts)
+        self._log_parts.clear()
+
     def ask(self, q: str):
+        self.flush()
         q = q + "?" if "?" not in q else q
         self.write(q)
         return super().read()
 
+    def read_raw(self, num: int=-1) -> bytearray:
+        """Reads the pending reply as raw bytes — no text decode pass over
+           (potentially MB-scale) waveform payloads. Reimplements the vxi11
+           bulk-read loop so chunks accumulate straight into the bytearray
+           handed back for in-place header stripping; the library version
+           returns immutable bytes that would cost a second full copy."""
+        if self.link is None:
+            self.open()
+
+        read_len = self.max_recv_size
+        if 0 < num < self.max_recv_size:
+            read_len = num
+
+        flags = 0
+        term_char = 0
+        if self.term_char is not None:
+            flags = vxi11.vxi11.OP_FLAG_TERMCHAR_SET
+            term_char = str(self.term_char).encode("utf-8")[0]
+
+        read_data = bytearray()
+        reason = 0
+        while reason & (vxi11.vxi11.RX_END | vxi11.vxi11.RX_CHR) == 0:
+            error, reason, data = self.client.device_read(
+                self.link, read_len, self._timeout_ms,
+                self._lock_timeout_ms, flags, term_char)
+            if error:
+                raise vxi11.vxi11.Vxi11Exception(error, 'read')
+            read_data.extend(data)
+            if num > 0:
+                num -= len(data)
+                if num <= 0:
+                    break
+                if num < read_len:
+                    read_len = num
+        return read_data
+
     def make_init(self, fpath: Path=None):
         fpath = self.ip+"_init.txt" if not fpath else fpath
         with open(fpath, "w+") as init_f:
-            init_f.write(self.log)
+            # stream the entries out without materializing the joined log
+            init_f.writelines(self._log_parts)
 
 #TODO: FIX ME
 class DebugScope(Scope):
+    supports_compound = False
+
     def __init__(self, loud: bool=False):
         self.make = "DEBUG_MAKE"
         self.model = "DEBUG"
-        self.log = ""
+        self._log_parts = []
 
         self.t_mode = "auto"
         self.t_type = "edge"
@@ -209,13 +507,19 @@ class DebugScope(Scope):
                           "trigger:a:edge:source": self.t_source}
 
     def ask(self, q: str):
-    #return q+'?' if '?' not in q else q
-        q += "?" if "?" not in q else ""
-        self.log += q + "\n"
-        return self.responses[q[:-1]] 
+        self.flush()
+        # responses are keyed by the bare command: strip the trailing '?'
+        # if present instead of appending one just to cut it back off
+        key = q[:-1] if q.endswith("?") else q
+        self._log_parts.append(key + "?\n")
+        return self.responses[key]
+
+    @property
+    def log(self):
+        return "".join(self._log_parts)
 
     def write(self, q:str):
-        self.log += q + "\n"
+        self._log_parts.append(q + "\n")
         q = q.split(" ")
         if len(q) > 1:
             self.responses[q[0]] = q[1]
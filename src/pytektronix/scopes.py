@@ -1,70 +1,233 @@
 
-import os
-from pathlib import Path
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from sys import intern
+from time import sleep
 from typing import Union, Tuple
+from weakref import WeakValueDictionary
 import numpy as np
+import pyvisa
 
-from pytektronix.pytektronix_base_classes import Scope, ScopeStateError, LoggedVXI11, LoggedVISA
+from pytektronix.pytektronix_base_classes import Scope, ScopeStateError, ScopeNotSupportedError, LoggedVXI11, LoggedVISA
 from pytektronix.command_group_objects import Trigger, Channel, Horizontal, WaveformTransfer
-
-# TODO: FIXME
-class MDO3024:
-    """The MDO3024 class is designed to control the Tektronix MDO3024 and perhaps other 3000
-    Series tektronix oscilloscopes. This scope encapsulates most of the main requirements for the 
-    oscilloscope, including Triggering (force and edge & more), horizontal controls, analog and digital
-    channels, as well as waveform capture details.
+from pytektronix.command_group_objects import TrigStrings, WFStrings
+
+# Channel-name sequences shared by the tables below; generated once rather
+# than re-listed per table. The f-string-built names are interned so
+# validator membership checks hit the identity fast path instead of
+# comparing characters, the way literal names already do.
+ANLG_CHAN_NAMES = tuple(intern(f"ch{i}") for i in range(1, 5))
+REF_CHAN_NAMES = tuple(intern(f"ref{i}") for i in range(1, 5))
+DIG_CHAN_NAMES = tuple(intern(f"d{i}") for i in range(16))
+MSO54_DIG_CHAN_NAMES = tuple(intern(f"ch{j}_d{i}") for j in range(1, 5) for i in range(16))
+
+# Accepted-value tables built once at import time; each scope instance takes
+# a shallow copy since some entries (e.g. "offset", "data_width") are
+# recomputed per instance at runtime.
+MDO3024_TRIGGER_ACCEPTED_VALUES = {"mode":      ("normal", "auto"),
+                                   "trig_type": ("edge", "logic", "pulse", "bus", "video"),
+                                   "source":    (*ANLG_CHAN_NAMES,
+                                                 *DIG_CHAN_NAMES,
+                                                 "line", "rf"),
+                                   "level":     ("ttl", "ecl", "any_number")}
+
+MDO3024_HORIZONTAL_ACCEPTED_VALUES = {"scale": ((4e-10, 1000),),
+                                      "position": ((0, 100),)}
+
+MDO3024_ANLG_CHAN_ACCEPTED_VALUES = {"position": ((-8.0, 8.0),),
+                                     "offset": ("any_number",),
+                                     "scale": ((1.0e-12, 500.0e12),),
+                                     "coupling": ("ac", "dc", "dcreject")}
+
+MDO3024_WAVEFORM_ACCEPTED_VALUES = {"data_source": (*ANLG_CHAN_NAMES,
+                                                    *REF_CHAN_NAMES,
+                                                    *DIG_CHAN_NAMES,
+                                                    "math", "rf_amplitude", "rf_frequency",
+                                                    "rf_phase", "rf_normal", "rf_average",
+                                                    "rf_maxhold", "rf_minhold"),
+                                    "data_encoding": ("ascii", "fastest", "ribinary",
+                                                      "rpbinary", "sribinary", "srpbinary",
+                                                      "fpbinary", "sfpbinary"),
+                                    "data_start":  ((1, 2e6),),
+                                    "data_stop": ((1, 2e6),),
+                                    "num_points": ((1, 2e6),)}
+
+MSO54_TRIGGER_A_ACCEPTED_VALUES = {"mode":      ("normal", "auto"),
+                                   "trig_type": ("edge", "logic", "width",
+                                                 "timeout", "runt", "window",
+                                                 "sethold", "transition", "bus"),
+                                   "source":    (*ANLG_CHAN_NAMES,
+                                                 *MSO54_DIG_CHAN_NAMES,
+                                                 "line", "aux"),
+                                   "level":     ("ttl", "ecl", "any_number")}
+
+MSO54_TRIGGER_B_ACCEPTED_VALUES = {"mode":      ("normal", "auto"),
+                                   "trig_type": ("edge", "logic", "pulse", "bus", "video"),
+                                   "source":    (*ANLG_CHAN_NAMES,
+                                                 *DIG_CHAN_NAMES,
+                                                 "line", "rf"),
+                                   "level":     ("ttl", "ecl", "any_number")}
+
+MSO54_ANLG_CHAN_ACCEPTED_VALUES = {"position": ("any_number",),
+                                   "offset": ("any_number",),
+                                   "scale": ("any_number",),
+                                   "coupling": ("ac", "dc", "dcreject")}
+
+MSO54_WAVEFORM_ACCEPTED_VALUES = {"data_source": (*ANLG_CHAN_NAMES,
+                                                  *REF_CHAN_NAMES,
+                                                  *MSO54_DIG_CHAN_NAMES,
+                                                  "math", "rf_amplitude", "rf_frequency",
+                                                  "rf_phase", "rf_normal", "rf_average",
+                                                  "rf_maxhold", "rf_minhold",
+                                                  *(intern(f"ch{i}_dall") for i in range(1,5)),
+                                                  "digitalall"),
+                                  "data_encoding": ("ascii", "fastest", "ribinary",
+                                                    "rpbinary", "sribinary", "srpbinary",
+                                                    "fpbinary", "sfpbinary"),
+                                  "data_start":  ((1, 2e6),),
+                                  "data_stop": ((1, 2e6),),
+                                  "num_points": ((1, 2e6),)}
+
+# Channel-offset lookup for the MDO3000 series (the MSO54 wrapper reuses
+# it): vdiv upper bounds, sorted so the matching offset range is found by
+# bisection instead of a per-call list scan.
+MDO3024_VDIV_BOUNDS = (50e-3, 100e-3, 500e-3, 995e-3, 5, 10)
+MDO3024_OFFSET_RANGES = ((-1, 1), (-.5, .5),
+                         (-10, 10), (-5, 5),
+                         (-100, 100), (-50, 50))
+
+@lru_cache(maxsize=64)
+def _offset_range_for(vdiv: float, probe_res: int) -> Tuple:
+    """Returns the accepted channel-offset range for a vertical scale and
+       probe class (probe_res truthy = 50 ohm). A vdiv above every bound
+       falls back to the widest range. Pure in its arguments, so repeated
+       offset updates at the same scale are an lru_cache hit."""
+    idx = bisect_left(MDO3024_VDIV_BOUNDS, vdiv)
+    if idx >= len(MDO3024_OFFSET_RANGES):
+        idx = len(MDO3024_OFFSET_RANGES) - 1
+    accepted_values = MDO3024_OFFSET_RANGES[idx]
+    if probe_res and accepted_values[1] > .5:
+        accepted_values = (-5, 5)
+    return accepted_values
+
+# Open transports shared across scope wrappers pointed at the same
+# resource: session setup (resource open plus the *IDN? round-trip)
+# dominates wrapper construction, so reopening the same scope becomes a
+# dict lookup. Weak values let a transport die with its last wrapper.
+_TRANSPORT_CACHE: WeakValueDictionary = WeakValueDictionary()
+
+def _transport_alive(instr: Scope) -> bool:
+    """Whether a cached transport's underlying session is still open: a
+       closed VISA resource raises InvalidSession on any session access,
+       and a closed VXI-11 instrument drops its link."""
+    visa_res = getattr(instr, "visa", None)
+    if visa_res is not None:
+        try:
+            visa_res.session
+        except pyvisa.errors.InvalidSession:
+            return False
+        return True
+    return getattr(instr, "link", None) is not None
+
+def _get_transport(resource_id: str, vxi11: bool) -> Scope:
+    """Returns the cached open transport for resource_id, building (and
+       caching) one on first use. Unnamed resources go through the
+       interactive chooser and are never shared. A cached transport whose
+       session has since been closed is evicted and rebuilt, so a wrapper
+       constructed after close() gets a live session again."""
+    if resource_id is None:
+        return LoggedVISA(resource_id=None) if not vxi11 else LoggedVXI11(IP=None)
+    key = (resource_id, vxi11)
+    instr = _TRANSPORT_CACHE.get(key)
+    if instr is not None and not _transport_alive(instr):
+        del _TRANSPORT_CACHE[key]
+        instr = None
+    if instr is None:
+        instr = LoggedVISA(resource_id=resource_id) if not vxi11 else LoggedVXI11(IP=resource_id)
+        _TRANSPORT_CACHE[key] = instr
+    return instr
+
+class ChannelMap:
+    """A lazy channel-label -> Channel mapping. Registration only stores the
+       per-channel (number, digital, prefix) tuples; Channel objects are
+       built on first access, so scopes with dozens of digital channels do
+       not pay for objects that are never touched. Supports the dict-style
+       access (indexing, keys(), membership) used throughout scopes.py."""
+
+    def __init__(self, instr: Scope, accepted_values: dict, strict: bool=True):
+        self._instr = instr
+        self._accepted_values = accepted_values
+        self._strict = strict
+        self._specs = {}
+        self._channels = {}
+
+    def add(self, label: str, chan_num: int, is_digital: bool=False, cn: str="ch"):
+        self._specs[label] = (chan_num, is_digital, cn)
+
+    def __getitem__(self, label: str) -> Channel:
+        ch = self._channels.get(label)
+        if ch is None:
+            chan_num, is_digital, cn = self._specs[label]
+            ch = Channel(chan_num, self._instr, self._accepted_values,
+                         is_digital=is_digital, strict=self._strict, cn=cn)
+            self._channels[label] = ch
+        return ch
+
+    def __contains__(self, label: str) -> bool:
+        return label in self._specs
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def keys(self):
+        return self._specs.keys()
+
+    def values(self):
+        return [self[label] for label in self._specs]
+
+    def items(self):
+        return [(label, self[label]) for label in self._specs]
+
+    def invalidate_caches(self) -> None:
+        """Drops the memoized probe queries on every channel built so far;
+           channels not yet constructed have nothing cached."""
+        for ch in self._channels.values():
+            ch.invalidate_cache()
+
+class TekScope:
+    """Shared behavior for the Tektronix scope wrappers: transport
+    construction, horizontal/channel/waveform command-group wiring, the
+    instr function remapping, and the set_*/get_*_info/waveform control
+    surface which used to be duplicated per model class. Subclasses
+    register their channels via _register_channels, wire up their own
+    triggers after calling this initializer, and override only what
+    genuinely differs per model (e.g. the MSO54's dual trigger).
     """
 
-    def __init__(self, resource_id: str=None, vxi11: bool = False, strict: bool = True):
-        """
-            Parameters:
-                - resource_id: The VISA name or the VXI11 ip address of the scope. Leave blank if unknow, and a connection wizard will be run.
-                - vxi11: default False, set to true if connecting the the scope via VXI11 not VISA 
-                - strict: default True, set to False if errors should be soft and not result in a raised exception.
-        """
-
-        self.instr = LoggedVISA(resource_id=resource_id) if not vxi11 else LoggedVXI11(IP=resource_id)
+    def __init__(self, resource_id: str=None, vxi11: bool=False, strict: bool=True,
+                 horizontal_accepted_values: dict=None,
+                 anlg_chan_accepted_values: dict=None,
+                 waveform_accepted_values: dict=None):
+        self.strict = strict
+        self.instr = _get_transport(resource_id, vxi11)
 
-        self.trigger_accepted_values = {"mode":      ["normal", "auto"],
-                                        "trig_type": ["edge", "logic", "pulse", "bus", "video"],
-                                        "source":    [*[f"ch{i}" for i in range(1,5)], 
-                                                      *[f"d{i}" for i in range(16)], 
-                                                      "line", "rf"],
-                                        "level":     ["ttl", "ecl", "any_number"]}
-        self.trigger = Trigger(self.instr, self.trigger_accepted_values)
-
-        self.horizontal_accepted_values = {"scale": [(4e-10, 1000)],
-                                           "position": [(0, 100)]}
+        self.horizontal_accepted_values = dict(horizontal_accepted_values)
         self.horizontal = Horizontal(self.instr, self.horizontal_accepted_values)
-        
-        self.anlg_chan_accepted_values = {"position": [(-8.0, 8.0)],
-                                          "offset": ["any_number"],
-                                          "scale": [(1.0e-12, 500.0e12)],
-                                          "coupling": ["ac", "dc", "dcreject"]}
+
+        self.anlg_chan_accepted_values = dict(anlg_chan_accepted_values)
         self.num_anlg_chans = 4
         self.num_digi_chans = 16
-        self.ch_dict = {}
+        self.ch_dict = ChannelMap(self.instr, self.anlg_chan_accepted_values, strict=strict)
+        self._register_channels()
+        # rendered once for error messages instead of repr'ing a
+        # dict_keys view on every bad set_channel call
+        self._ch_names_str = ", ".join(sorted(self.ch_dict.keys()))
 
-        for i in range(1, self.num_anlg_chans+1):
-            self.ch_dict[f"ch{i}"] = Channel(i, self.instr, self.anlg_chan_accepted_values, strict=strict)
-        for i in range(0, self.num_digi_chans):
-            # TODO: FIXME THIS IS INCORRECT ACCEPTED VALUES
-            self.ch_dict[f"d{i}"] = Channel(i, self.instr, self.anlg_chan_accepted_values, is_digital=True, strict=strict)
-        
-        #self.channels = (c for c in self.ch_dict.values)
-
-        self.waveform_accepted_values = {"data_source": [*[f"ch{i}" for i in range(1,5)],
-                                                         *[f"ref{i}" for i in range(1,5)],
-                                                         *[f"d{i}" for i in range(0,16)],
-                                                         "math", "rf_amplitude", "rf_frequency",
-                                                         "rf_phase", "rf_normal", "rf_average",
-                                                         "rf_maxhold", "rf_minhold"],
-                                         "data_encoding": ["ascii", "fastest", "ribinary", 
-                                                           "rpbinary", "sribinary", "srpbinary",
-                                                           "fpbinary", "sfpbinary"],
-                                         "data_start":  [(1, 2e6)],
-                                         "data_stop": [(1, 2e6)],
-                                         "num_points": [(1, 2e6)]}
+        self.waveform_accepted_values = dict(waveform_accepted_values)
         self.waveform = WaveformTransfer(self.instr, self.waveform_accepted_values)
 
         # TODO: allow data output to be list of bytes, floats, a csv or a estrace file
@@ -77,51 +240,89 @@ class MDO3024:
 
         self.write = self.instr.write
         self.ask = self.instr.ask
+        self.ask_many = self.instr.ask_many
         self.read_raw = self.instr.read_raw
         self.close = self.instr.close
 
-        self.write("HEADER 0")
+        self.instr.ensure_header(0)
+        self._verify_header()
+
+    def _register_channels(self) -> None:
+        """Registers this model's channel labels on self.ch_dict"""
+        raise NotImplementedError
+
+    def wait_until_idle(self, interval: float=0.05) -> None:
+        """Blocks until the scope reports not BUSY. Polls with the
+           transport's lightweight poll query when it has one, instead of
+           issuing full logged ask round-trips in a tight loop.
+
+            Parameters:
+                - interval: seconds slept between polls
+        """
+
+        poll = getattr(self.instr, "poll", None)
+        read_busy = (lambda: int(poll("BUSY"))) if poll else (lambda: int(self.ask("BUSY")))
+        while read_busy():
+            sleep(interval)
+
+    def _verify_header(self) -> None:
+        """Reads HEADER back after a state-changing write to confirm it
+           stuck (verify-then-commit). Only runs in strict mode - in
+           non-strict mode the write is trusted and no confirming
+           round-trip is spent."""
+        if not self.strict:
+            return
+        if self.instr.ask("HEADER").strip() not in ("0", "OFF"):
+            raise ScopeStateError("Scope did not accept 'HEADER 0'")
+        self.instr._header_mode = 0
+
+    def invalidate_probe_cache(self) -> None:
+        """Forgets cached per-channel probe resistances, forcing the next
+           offset-range computation to re-query the scope. Call after
+           hot-swapping probes or restoring a setup."""
+        self.ch_dict.invalidate_caches()
 
     def default_setup(self):
         """Does exactly what pressing the 'Default Setup' or 'Auto Setup' button on the front
         panel of the oscilloscope would do
         """
 
-        self.write("fpanel:press defaultsetup")
-        self.write("HEADER 0")
-
-    def compute_channel_offset_range(self, channel: Channel) -> Tuple:
-        """ Internal function used to compute the accepted values of the 
-            channel offset depending on probe resistance and the vertical scale. 
+        if self.instr.supports_compound:
+            self.write("fpanel:press defaultsetup;:HEADER 0")
+        else:
+            self.write("fpanel:press defaultsetup")
+            self.write("HEADER 0")
+        # the default setup resets header mode on the scope; the compound
+        # write above restores it, so record the known state
+        self.instr._header_mode = 0
+        # every memoized value recorded before the reset is now suspect
+        self.invalidate_probe_cache()
+        self.trigger.invalidate_cache()
+        triggerB = getattr(self, "triggerB", None)
+        if triggerB is not None:
+            triggerB.invalidate_cache()
+        self.waveform.invalidate_cache()
+        self._verify_header()
+
+    def compute_channel_offset_range(self, channel: str) -> Tuple:
+        """ Internal function used to compute the accepted values of the
+            channel offset depending on probe resistance and the vertical scale.
 
             Parameters:
-                Channel: which channel to check the probe resistance of
+                channel: label of the channel to check the probe resistance of
 
             Returns:
                 Tuple: (accepted values)
         """
 
-        probe_res = {10e6: 0, 
-                     50: 1}[float(self.ch_dict[channel].probe_resistance)]
-
-        vdiv = self.scale
-
-        mdo3024_ranges = [(1e-3, 50e-3), (50e-3,100e-3), 
-                          (100e-3, 500e-3), (505e-3, 995e-3), 
-                          (1, 5), (5, 10)]
+        ch = self.ch_dict[channel]
+        # 50-ohm probes clamp the range; anything high-impedance (10M)
+        # does not. The threshold comparison avoids hashing a float that
+        # may not compare exactly equal to the dict key
+        probe_res = 1 if float(ch.probe_resistance) < 1000 else 0
+        return _offset_range_for(ch.scale, probe_res)
 
-        for idx, ran in enumerate(mdo3024_ranges):
-            if vdiv > max(ran):
-                continue
-            accepted_values = [(-1, 1), (-.5, .5), 
-                               (-10, 10), (-5, 5), 
-                               (-100, 100), (-50, 50)][idx]
-            if probe_res and max(accepted_values) > .5:
-                accepted_values = (-5, 5)
-
-        return accepted_values
-
-    def set_trigger(self, mode: str=None, trig_type: str=None, 
+    def set_trigger(self, mode: str=None, trig_type: str=None,
                     source: str=None, level: Union[str, float]=None) -> None:
         """A scope method to set all trigger attributes desired.
 
@@ -132,28 +333,41 @@ class MDO3024:
                 - level: desired level of the trigger in Volts, or (ttl, ecl)
         """
 
-        if mode:
-            self.trigger.mode = mode 
-        if trig_type:
-            self.trigger.trig_type = trig_type
-        if source:
-            self.trigger.source = source
-        if level is not None:
-            self.trigger.level = level
+        with self.instr.auto_flush():
+            if mode:
+                self.trigger.mode = mode
+            if trig_type:
+                self.trigger.trig_type = trig_type
+            if source:
+                self.trigger.source = source
+            if level is not None:
+                self.trigger.level = level
 
     #TODO: get individual settings
     def get_trigger_info(self, setting: str=None) -> str:
         """A getter to retreive and show all settings currently set for the trigger.
-           returns a string of all info.
+           returns a string of all info. Reads are batched into compound SCPI
+           queries (Scope.ask_many) so the summary costs a couple of bus
+           round-trips instead of one per property.
 
             Parameters:
                 setting: No Effect as of now... #TODO - get individual settings
         """
 
-        return f"Mode: {self.trigger.mode}\n\
-               \rType: {self.trigger.trig_type}\n\
-               \rSource: {self.trigger.source}\n\
-               \rLevel: {self.trigger.level}"
+        cn = self.trigger.cn
+        raw_mode, raw_type = self.ask_many([f"{cn}:mode", f"{cn}:type"])
+        mode = TrigStrings.resolve(raw_mode)
+        trig_type = TrigStrings.resolve(raw_type)
+        if trig_type != "edge":
+            raise NotImplementedError("Source can only be read when trig type is edge")
+        source = self.ask(f"{cn}:{trig_type}:source").lower()
+        # the property guards against sources (line, rf) whose level node
+        # does not exist, returning the "cannot be ascertained" message
+        level = self.trigger.level
+        return "\n".join((f"Mode: {mode}",
+                          f"Type: {trig_type}",
+                          f"Source: {source}",
+                          f"Level: {level}"))
         
     def set_horizontal(self, scale: float=None, position: float=None) -> None:
         """A scope method to set all horizontal attributes desired.
@@ -163,21 +377,25 @@ class MDO3024:
                 - position: horizontal positioning expressed as a percentage of the screen (0, 100)
         """
 
-        if scale is not None:
-            self.horizontal.scale = scale
-        if position is not None:
-            self.horizontal.position = position
+        with self.instr.auto_flush():
+            if scale is not None:
+                self.horizontal.scale = scale
+            if position is not None:
+                self.horizontal.position = position
 
     def get_horizontal_info(self, setting: str=None) -> str:
         """A getter to retreive and show all settings currently set for the Horizontal.
-           returns a string of all info.
-        
+           returns a string of all info. Both reads are batched into a single
+           compound SCPI query.
+
             Parameters:
                 setting: No Effect as of now... #TODO - get individual settings
         """
 
-        return f"Scale: {self.horizontal.scale}\n \
-                 \rPosition: {self.horizontal.position}"
+        cn = self.horizontal.cn
+        scale, position = self.ask_many([f"{cn}:scale", f"{cn}:position"])
+        return "\n".join((f"Scale: {float(scale)}",
+                          f"Position: {float(position)}"))
 
     def set_channel(self, channel: str, position: float=None, offset: float=None, 
                     scale: float=None, coupling: str=None) -> None:
@@ -191,33 +409,54 @@ class MDO3024:
                 - coupling: specify coupling of a given channel (AC, DC, DCREJECT)
         """
 
-        if channel not in self.ch_dict.keys():
+        if channel not in self.ch_dict:
             if self.strict:
-                raise ValueError(f"No Channel '{channel}'. Must be one of {self.ch_dict.keys()}")
-            print(f"No Channel '{channel}'. Must be one of {self.ch_dict.keys()}") 
-
-        if position is not None:
-            self.ch_dict[channel].position = position
-        if offset is not None:
-            self.ch_dict[channel].accepted_values["offset"] = [self.compute_channel_offset_range(self.ch_dict[channel])]
-            self.ch_dict[channel].offset = offset
-        if scale is not None:
-            self.ch_dict[channel].scale = scale
-        if coupling is not None:
-            self.ch_dict[channel].coupling = coupling
+                raise ValueError(f"No Channel '{channel}'. Must be one of: {self._ch_names_str}")
+            print(f"No Channel '{channel}'. Must be one of: {self._ch_names_str}")
+
+        ch = self.ch_dict[channel]
+        with self.instr.auto_flush():
+            if position is not None:
+                ch.position = position
+            if offset is not None:
+                offset_range = self.compute_channel_offset_range(channel)
+                # only swap the accepted-value entry when the range
+                # actually changed; an unconditional reassign rebuilt the
+                # identity-cached validator on every offset write. The
+                # entry lives in the accepted-values dict shared by every
+                # channel of this scope, so the comparison must be against
+                # the installed entry itself - a per-channel memo can match
+                # while another channel's range sits in the shared dict
+                installed = ch.accepted_values.get("offset")
+                if not installed or installed[0] != offset_range:
+                    ch.accepted_values["offset"] = [offset_range]
+                ch.offset = offset
+            if scale is not None:
+                ch.scale = scale
+            if coupling is not None:
+                ch.coupling = coupling
 
     def get_channel_info(self, channel: str) -> str:
         """A getter to retreive and show all settings currently set for the Channel.
-           returns a string of all info.
-            
+           returns a string of all info. All four reads are batched into a
+           single compound SCPI query.
+
             Parameters:
                 channel: a channel label (ch<x>, d<x>) of which to get info from
         """
 
-        return f"{channel} Position: {self.ch_dict[channel].position}\n \
-                 \r{channel} Offset: {self.ch_dict[channel].offset}\n \
-                 \r{channel} scale: {self.ch_dict[channel].scale}\n \
-                 \r{channel} coupling: {self.ch_dict[channel].scale}"
+        ch = self.ch_dict[channel]
+        if ch.is_digital:
+            raise ScopeNotSupportedError("Digital Channels have no position property")
+        cn = ch.cn
+        position, offset, scale, coupling = self.ask_many([f"{cn}:position",
+                                                           f"{cn}:offset",
+                                                           f"{cn}:scale",
+                                                           f"{cn}:coupling"])
+        return "\n".join((f"{channel} Position: {float(position)}",
+                          f"{channel} Offset: {float(offset)}",
+                          f"{channel} scale: {float(scale)}",
+                          f"{channel} coupling: {coupling}"))
 
     def set_digital(self) -> None:
         """A scope method to set all digital channel attributes"""
@@ -237,27 +476,34 @@ class MDO3024:
                 - data_stop: at which sample to stop the data capture (1 to 2e6)
         """
 
-        if data_source is not None:
-            self.waveform.data_source = data_source 
-        if data_encoding is not None: 
-            self.waveform.data_encoding = data_encoding 
-        if data_width is not None: 
-            self.waveform.data_width = data_width
-        if data_start is not None:
-            self.waveform.data_start = data_start
-        if data_stop is not None:
-            self.waveform.data_stop = data_stop
+        with self.instr.auto_flush():
+            if data_source is not None:
+                self.waveform.data_source = data_source
+            if data_encoding is not None:
+                self.waveform.data_encoding = data_encoding
+            if data_width is not None:
+                self.waveform.data_width = data_width
+            if data_start is not None:
+                self.waveform.data_start = data_start
+            if data_stop is not None:
+                self.waveform.data_stop = data_stop
 
     def get_waveform_info(self) -> str:
         """A getter to retreive and show all settings currently set for the waveform capture.
-           returns a string of all info.
+           returns a string of all info. All five reads are batched into a
+           single compound SCPI query.
         """
 
-        return f"Data Source: {self.waveform.data_source}\n \
-                \rData Encoding: {self.waveform.data_encoding}\n \
-                \rData Width (bytes): {self.waveform.data_width}\n \
-                \rData Start (sample): {self.waveform.data_start}\n \
-                \rData Stop (sample): {self.waveform.data_stop}"
+        source, encoding, width, start, stop = self.ask_many(["data:source",
+                                                              "data:encdg",
+                                                              "data:width",
+                                                              "data:start",
+                                                              "data:stop"])
+        return "\n".join((f"Data Source: {source}",
+                          f"Data Encoding: {WFStrings.resolve(encoding)}",
+                          f"Data Width (bytes): {int(width)}",
+                          f"Data Start (sample): {int(start)}",
+                          f"Data Stop (sample): {int(stop)}"))
 
     #TODO: Convert dat into useful for
     def get_waveform(self, format: str='default') -> Union[bytearray, np.ndarray, list]:
@@ -267,219 +513,110 @@ class MDO3024:
                 - format: Specify return type as bytearray ('default'), list ('list') or numpy ndarray ('np_array')
         """
 
-        data = self.waveform.get_data()
-        dw = {1: np.uint8,
-              2: np.uint16,
-              4: np.uint32,
-              8: np.uint64} 
-
         if not format or format == 'default':
-            return data
-        
-        if format == "np_array":
-            return np.frombuffer(data, dtype=dw[self.waveform.data_width])
+            return self.waveform.get_data()
 
-        if format == "list":
-            return list(np.frombuffer(data, dtype=dw[self.waveform.data_width]))
-        
-
-class MSO54:
-    def __init__(self, resource_id: str=None, vxi11: bool = False, strict: bool = True):
-
-        self.instr = LoggedVISA(resource_id=resource_id) if not vxi11 else LoggedVXI11(IP=resource_id)
-
-        self.num_anlg_chans = 4
-        self.num_digi_chans = 16
+        # decoded in one vectorized zero-copy frombuffer pass
+        arr = self.waveform.get_data_array()
 
-        self.triggerAAcceptedValues = {"mode":      ["normal", "auto"],
-                                        "trig_type": ["edge", "logic", "width", 
-                                                      "timeout", "runt", "window", 
-                                                      "sethold", "transition", "bus"],
-                                        "source":    [*[f"ch{i}" for i in range(1,self.num_anlg_chans+1)], 
-                                                      *[f"ch{j}_d{i}" for j in range(1,self.num_anlg_chans + 1) for i in range(self.num_digi_chans)], 
-                                                      "line", "aux"],
-                                        "level":     ["ttl", "ecl", "any_number"]}
-        self.trigger = Trigger(self.instr, self.triggerAAcceptedValues)
-        self.triggerBAcceptedValues = {"mode":      ["normal", "auto"],
-                                        "trig_type": ["edge", "logic", "pulse", "bus", "video"],
-                                        "source":    [*[f"ch{i}" for i in range(1,5)], 
-                                                      *[f"d{i}" for i in range(16)], 
-                                                      "line", "rf"],
-                                        "level":     ["ttl", "ecl", "any_number"]}
-        self.triggerB = Trigger(self.instr, self.triggerBAcceptedValues, cn="trigger:b")
+        if format == "np_array":
+            return arr
 
-        self.horizontal_accepted_values = {"scale": [(4e-10, 1000)],
-                                           "position": [(0, 100)]}
-        self.horizontal = Horizontal(self.instr, self.horizontal_accepted_values)
-        
-        self.anlg_chan_accepted_values = {"position": ["any_number"],
-                                          "offset": ["any_number"],
-                                          "scale": ["any_number"],
-                                          "coupling": ["ac", "dc", "dcreject"]}
-        self.ch_dict = {}
+        if format == "array":
+            # compact typed buffer: same samples at ~1 byte-per-sample
+            # overhead instead of a list of boxed Python ints. The wire
+            # dtypes are explicitly big-endian while array.array always
+            # reads the buffer in native order, so normalize first (a
+            # no-op copy-free astype when the orders already agree)
+            arr = arr.astype(arr.dtype.newbyteorder('='), copy=False)
+            return array(arr.dtype.char, arr.tobytes())
 
-        for i in range(1, self.num_anlg_chans+1):
-            self.ch_dict[f"ch{i}"] = Channel(i, self.instr, self.anlg_chan_accepted_values, strict=strict)
-            for j in range(0, self.num_digi_chans):
-                self.ch_dict[f"ch_{i}_d{j}"] = Channel(j, self.instr, self.anlg_chan_accepted_values, is_digital=True, strict=strict, cn=f"ch{i}_d")
-        
-        #self.channels = (c for c in self.ch_dict.values)
-
-        self.waveform_accepted_values = {"data_source": [*[f"ch{i}" for i in range(1,self.num_anlg_chans+1)],
-                                                         *[f"ref{i}" for i in range(1,5)],
-                                                         *[f"ch{j}_d{i}" for j in range(1, self.num_anlg_chans+1) for i in range(self.num_digi_chans)],
-                                                         "math", "rf_amplitude", "rf_frequency",
-                                                         "rf_phase", "rf_normal", "rf_average",
-                                                         "rf_maxhold", "rf_minhold",
-                                                         *[f"ch{i}_dall" for i in range(1,self.num_anlg_chans+1)],
-                                                         "digitalall"],
-                                         "data_encoding": ["ascii", "fastest", "ribinary", 
-                                                           "rpbinary", "sribinary", "srpbinary",
-                                                           "fpbinary", "sfpbinary"],
-                                         "data_start":  [(1, 2e6)],
-                                         "data_stop": [(1, 2e6)],
-                                         "num_points": [(1, 2e6)]}
-        self.waveform = WaveformTransfer(self.instr, self.waveform_accepted_values)
+        if format == "list":
+            # ndarray.tolist() unboxes to plain Python ints in one C pass;
+            # list(arr) would build a list of numpy scalars element-wise
+            return arr.tolist()
+
+    def get_waveform_into(self, out: np.ndarray) -> np.ndarray:
+        """Captures a waveform into a caller-supplied preallocated array
+           and returns the filled view, so repeated captures in a loop
+           reuse one output buffer instead of allocating a fresh array
+           per capture. The decode itself stays a zero-copy frombuffer
+           view; the single bulk copy into `out` also performs any dtype
+           conversion.
 
-        # TODO: allow data output to be list of bytes, floats, a csv or a estrace file
-        self.data_output_type = None
-        self.allowed_data_output_types = []
+            Parameters:
+                - out: a 1-D numpy array at least as long as the capture
+        """
 
-        # Function Remapping for simplicity
-        self.make = self.instr.make
-        self.model = self.instr.model
+        arr = self.waveform.get_data_array()
+        n = arr.size
+        if n > out.size:
+            raise ValueError(f"Output buffer holds {out.size} samples but the capture has {n}")
+        out[:n] = arr
+        return out[:n]
 
-        self.write = self.instr.write
-        self.ask = self.instr.ask
-        self.read_raw = self.instr.read_raw
-        self.close = self.instr.close
+# TODO: FIXME
+class MDO3024(TekScope):
+    """The MDO3024 class is designed to control the Tektronix MDO3024 and perhaps other 3000
+    Series tektronix oscilloscopes. This scope encapsulates most of the main requirements for the
+    oscilloscope, including Triggering (force and edge & more), horizontal controls, analog and digital
+    channels, as well as waveform capture details.
+    """
 
-        self.write("HEADER 0")
+    def __init__(self, resource_id: str=None, vxi11: bool = False, strict: bool = True):
+        """
+            Parameters:
+                - resource_id: The VISA name or the VXI11 ip address of the scope. Leave blank if unknow, and a connection wizard will be run.
+                - vxi11: default False, set to true if connecting the the scope via VXI11 not VISA
+                - strict: default True, set to False if errors should be soft and not result in a raised exception.
+        """
 
-    def default_setup(self):
-        self.write("fpanel:press defaultsetup")
-        self.write("HEADER 0")
+        super().__init__(resource_id, vxi11, strict,
+                         MDO3024_HORIZONTAL_ACCEPTED_VALUES,
+                         MDO3024_ANLG_CHAN_ACCEPTED_VALUES,
+                         MDO3024_WAVEFORM_ACCEPTED_VALUES)
 
-    def compute_channel_offset_range(self, channel: Channel) -> Tuple:
-        probe_res = {10e6: 0, 
-                     50: 1}[float(self.ch_dict[channel].probe_resistance)]
+        self.trigger_accepted_values = dict(MDO3024_TRIGGER_ACCEPTED_VALUES)
+        self.trigger = Trigger(self.instr, self.trigger_accepted_values)
 
-        vdiv = self.scale
+    def _register_channels(self) -> None:
+        for i in range(1, self.num_anlg_chans+1):
+            self.ch_dict.add(f"ch{i}", i)
+        for i in range(0, self.num_digi_chans):
+            # TODO: FIXME THIS IS INCORRECT ACCEPTED VALUES
+            self.ch_dict.add(f"d{i}", i, is_digital=True)
 
-        mdo3024_ranges = [(1e-3, 50e-3), (50e-3,100e-3), 
-                          (100e-3, 500e-3), (505e-3, 995e-3), 
-                          (1, 5), (5, 10)]
+class MSO54(TekScope):
+    def __init__(self, resource_id: str=None, vxi11: bool = False, strict: bool = True):
+        super().__init__(resource_id, vxi11, strict,
+                         MDO3024_HORIZONTAL_ACCEPTED_VALUES,
+                         MSO54_ANLG_CHAN_ACCEPTED_VALUES,
+                         MSO54_WAVEFORM_ACCEPTED_VALUES)
 
-        for idx, ran in enumerate(mdo3024_ranges):
-            if vdiv > max(ran):
-                continue
-            accepted_values = [(-1, 1), (-.5, .5), 
-                               (-10, 10), (-5, 5), 
-                               (-100, 100), (-50, 50)][idx]
-            if probe_res and max(accepted_values) > .5:
-                accepted_values = (-5, 5)
+        self.triggerAAcceptedValues = dict(MSO54_TRIGGER_A_ACCEPTED_VALUES)
+        self.trigger = Trigger(self.instr, self.triggerAAcceptedValues)
+        self.triggerBAcceptedValues = dict(MSO54_TRIGGER_B_ACCEPTED_VALUES)
+        self.triggerB = Trigger(self.instr, self.triggerBAcceptedValues, cn="trigger:b")
 
-        return accepted_values
+    def _register_channels(self) -> None:
+        for i in range(1, self.num_anlg_chans+1):
+            self.ch_dict.add(f"ch{i}", i)
+            for j in range(0, self.num_digi_chans):
+                self.ch_dict.add(f"ch_{i}_d{j}", j, is_digital=True, cn=f"ch{i}_d")
 
     def set_trigger(self, trigger: str="a", mode: str=None, trig_type: str=None, 
                     source: str=None, level: Union[str, float]=None) -> None:
         """A scope method to set all trigger attributes desired"""
-        if mode:
-            self.trigger.mode = mode
-        if trig_type:
-            self.trigger.trig_type = trig_type
-        if source:
-            self.trigger.source = source
-        if level is not None:
-            self.trigger.level = level
-
-    def get_trigger_info(self, setting: str=None) -> str:
-        #TODO: get individual settings
-        return f"Mode: {self.trigger.mode}\n\
-               \rType: {self.trigger.trig_type}\n\
-               \rSource: {self.trigger.source}\n\
-               \rLevel: {self.trigger.level}"
-        
-    def set_horizontal(self, scale: float=None, position: float=None) -> None:
-        """A scope method to set all horizontal attributes desired"""
-        if scale is not None:
-            self.horizontal.scale = scale
-        if position is not None:
-            self.horizontal.position = position
-
-    def get_horizontal_info(self, setting: str=None) -> str:
-        return f"Scale: {self.horizontal.scale}\n \
-                 \rPosition: {self.horizontal.position}"
-
-    def set_channel(self, channel: str, position: float=None, offset: float=None, 
-                    scale: float=None, coupling: str=None) -> None:
-        """A scope method to set all channel attributes desired"""
-        if channel not in self.ch_dict.keys():
-            if self.strict:
-                raise ValueError(f"No Channel '{channel}'. Must be one of {self.ch_dict.keys()}")
-            print(f"No Channel '{channel}'. Must be one of {self.ch_dict.keys()}") 
-
-        if position is not None:
-            self.ch_dict[channel].position = position
-        if offset is not None:
-            self.ch_dict[channel].accepted_values["offset"] = [self.compute_channel_offset_range(self.ch_dict[channel])]
-            self.ch_dict[channel].offset = offset
-        if scale is not None:
-            self.ch_dict[channel].scale = scale
-        if coupling is not None:
-            self.ch_dict[channel].coupling = coupling
-
-    def get_channel_info(self, channel: str) -> str:
-        return f"{channel} Position: {self.ch_dict[channel].position}\n \
-                 \r{channel} Offset: {self.ch_dict[channel].offset}\n \
-                 \r{channel} scale: {self.ch_dict[channel].scale}\n \
-                 \r{channel} coupling: {self.ch_dict[channel].scale}"
-
-    def set_digital(self) -> None:
-        """A scope method to set all digital channel attributes"""
-        raise NotImplementedError
+        with self.instr.auto_flush():
+            if mode:
+                self.trigger.mode = mode
+            if trig_type:
+                self.trigger.trig_type = trig_type
+            if source:
+                self.trigger.source = source
+            if level is not None:
+                self.trigger.level = level
 
-    def set_waveform(self, data_source: str=None, data_encoding: str=None, 
-                     data_width: int=None, data_start: int=None, 
-                     data_stop: int=None) -> None:
-        """A scope method to set all waveform data related attributes"""
-        if data_source is not None:
-            self.waveform.data_source = data_source 
-        if data_encoding is not None: 
-            self.waveform.data_encoding = data_encoding 
-        if data_width is not None: 
-            self.waveform.data_width = data_width
-        if data_start is not None:
-            self.waveform.data_start = data_start
-        if data_stop is not None:
-            self.waveform.data_stop = data_stop
-
-    def get_waveform_info(self) -> str:
-        return f"Data Source: {self.waveform.data_source}\n \
-                \rData Encoding: {self.waveform.data_encoding}\n \
-                \rData Width (bytes): {self.waveform.data_width}\n \
-                \rData Start (sample): {self.waveform.data_start}\n \
-                \rData Stop (sample): {self.waveform.data_stop}"
-
-    #TODO: Convert dat into useful for
-    def get_waveform(self, format: str='default') -> Union[bytearray, np.ndarray, list]:
-        """A scope method to caputure data from the scope"""
-
-        data = self.waveform.get_data()
-        dw = {1: np.uint8,
-              2: np.uint16,
-              4: np.uint32,
-              8: np.uint64} 
-
-        if not format or format == 'default':
-            return data
-        
-        if format == "np_array":
-            return np.frombuffer(data, dtype=dw[self.waveform.data_width])
-
-        if format == "list":
-            return list(np.frombuffer(data, dtype=dw[self.waveform.data_width]))
- 
 if __name__ == "__main__":
     scope = MSO54()
-    print(f"Make: {scope.instr.make}\nModel: {scope.instr.model}")
+    print(f"Make: {scope.make}\nModel: {scope.model}")
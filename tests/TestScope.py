@@ -1,11 +1,14 @@
 from pytektronix.pytektronix_base_classes import Scope
 
 class TestScope(Scope):
+   supports_compound = False
+
    def __init__(self):
       self.strings = {}
       pass
 
    def ask(self, q: str) -> str:
+      self.flush()
       if q.endswith("?"):
          q = q.replace("?", "")
       if q not in self.strings.keys():
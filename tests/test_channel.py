@@ -24,10 +24,12 @@ def setup_module():
                                VISA connection (USB, TCPIP, ETHERNET)")
 
     SCOPE.write("fpanel:press defaultsetup")
-    while int(SCOPE.ask("BUSY")):
-        continue
+    SCOPE.ask("*OPC?")
     SCOPE.write("fpanel:press menuoff")
 
+    yield
+    SCOPE.close()
+
 def test_init(TestScope) -> None:
     """Creates a test channel with the test scope, and expects its default name
        to be 'ch1'"""
@@ -79,10 +81,4 @@ def test_probe_resistance(TestScope) -> None:
     scope = TestScope
     chan = Channel(3, scope, AV)
 
-    assert(type(chan.probe_resistance) == float)
-
-
-def test_sessionfinish():
-    """Exits test suite cleanly"""
-    global SCOPE
-    SCOPE.close()
+    assert(isinstance(chan.probe_resistance, float))
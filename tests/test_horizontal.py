@@ -19,10 +19,12 @@ def setup_module():
         raise ScopeStateError("Please Connect a tektronix Scope to a VISA connection (USB, TCPIP, ETHERNET)")
 
     SCOPE.write("fpanel:press defaultsetup")
-    while int(SCOPE.ask("BUSY")):
-        continue
+    SCOPE.ask("*OPC?")
     SCOPE.write("fpanel:press menuoff")
 
+    yield
+    SCOPE.close()
+
 
 def test_init(TestScope) -> None:
     scope = TestScope
@@ -47,7 +49,3 @@ def test_position(TestScope) -> None:
     a = hor.position
     assert(a == 50)
 
-def test_sessionfinish() -> None:
-    global SCOPE
-    SCOPE.close()
-
@@ -4,7 +4,7 @@ import os
 
 def _test_logged_vxi_dfault() -> None:
     instr = LoggedVXI11("123.123.123.123")
-    assert(type(instr) == LoggedVXI11)
+    assert(isinstance(instr, LoggedVXI11))
 
 def _test_make_init() -> None:
     instr = LoggedVXI11("123.123.123.123")
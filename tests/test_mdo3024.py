@@ -14,10 +14,12 @@ def setup_module():
         raise ScopeStateError("Please Connect a tektronix Scope to a VISA connection (USB, TCPIP, ETHERNET)")
 
     SCOPE.write("fpanel:press defaultsetup")
-    while int(SCOPE.ask("BUSY")):
-        continue
+    SCOPE.ask("*OPC?")
     SCOPE.write("fpanel:press menuoff")
 
+    yield
+    SCOPE.close()
+
 def test_create():
     assert(SCOPE.make.lower() == "tektronix") 
     assert(SCOPE.model.lower() == "mdo3024")
@@ -50,5 +52,15 @@ def test_set_trigger_level():
         SCOPE.set_trigger(level=level)
         assert(SCOPE.trigger.level == level)
 
-def test_sessionfinish():
-    SCOPE.close()
+def test_get_info():
+    trig_info = SCOPE.get_trigger_info()
+    assert("Mode:" in trig_info and "Level:" in trig_info)
+
+    hor_info = SCOPE.get_horizontal_info()
+    assert("Scale:" in hor_info and "Position:" in hor_info)
+
+    ch_info = SCOPE.get_channel_info("ch1")
+    assert("ch1 Offset:" in ch_info)
+
+    wf_info = SCOPE.get_waveform_info()
+    assert("Data Source:" in wf_info)